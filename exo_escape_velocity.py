@@ -1,95 +1,432 @@
+import asyncio
+import contextlib
+import csv
+import hashlib
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
 import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pyvo as vo
-import sys
+from astropy.table import Table
 
-def get_vo_exodataset(ADQL_query):
+# Numba is optional. Without it, escape velocities are computed with NumPy only
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+logger = logging.getLogger(__name__)
+
+# Escape velocity constants, 2*G*M/(R*10^6), for masses and radii given in Earth or Jupiter units
+# Folding 2*G, the mass and radius unit conversions and the change from m^2/s^2 to km^2/s^2 into one
+# scalar leaves sqrt(K * mass / radius) as the only work per exoplanet
+K_EARTH = (2.0 * 6.674e-11 * 5.97219e24) / (6.371e6 * 1.0e6)
+K_JUPITER = (2.0 * 6.674e-11 * 1.89813e27) / (6.9911e7 * 1.0e6)
+
+# Mass column, radius column and escape velocity constant for each units system, keyed by earth_units_flag
+UNITS_COLUMNS = {
+    True: ("pl_bmasse", "pl_rade", K_EARTH),
+    False: ("pl_bmassj", "pl_radj", K_JUPITER)
+}
+
+# Directory and lifetime of cached TAP responses. The archive tables only change on the scale of months,
+# so repeating a query within that time reads its results from disk instead of the network
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "exo_escape_velocity")
+CACHE_EXPIRE_SECONDS = 30 * 24 * 60 * 60
+
+# Minimum number of exoplanets for the Numba kernel to be used. Smaller arrays are faster with NumPy alone
+NUMBA_MIN_PLANETS = 10000
+
+# Retry policy for TAP requests. Connection errors and transient server errors are retried with exponential backoff
+TAP_RETRY = Retry(total=5, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504], raise_on_status=False)
+
+# Number of connections to the archive kept open by the HTTP session, and the default number of concurrent requests
+MAX_CONNECTIONS = 8
+
+# TAP service and HTTP session shared by every query, created on first use
+# The lock stops worker threads that make their first query at the same time from each creating one
+_TAP = None
+_SESSION = None
+_CLIENT_LOCK = threading.Lock()
+
+def _tap():
+    """
+    Gets the PyVO TAP service for the NASA Exoplanet Archive, creating it on the first call only.
+
+    :return: PyVO TAPService connected to the NASA TAP endpoint.
+    """
+    global _TAP
+    with _CLIENT_LOCK:
+        if _TAP is None:
+            _TAP = vo.dal.TAPService("https://exoplanetarchive.ipac.caltech.edu/TAP")
+    return _TAP
+
+def _session():
+    """
+    Gets the requests session used for TAP requests, creating it on the first call only. Reusing the session
+    keeps its connections to the archive open, so later requests skip the TCP/TLS handshake. The connection pool
+    holds MAX_CONNECTIONS connections and concurrent requests beyond that wait for a free connection, rather than
+    opening extra connections that are closed after a single use. Failed requests are retried with TAP_RETRY.
+
+    :return: Requests session with the TAP request headers set.
+    """
+    global _SESSION
+    with _CLIENT_LOCK:
+        if _SESSION is None:
+            _SESSION = requests.Session()
+            _SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=MAX_CONNECTIONS, pool_block=True,
+                                                      max_retries=TAP_RETRY))
+            _SESSION.headers.update({
+                "Content-Type": "application/x-www-form-urlencoded",
+                "Accept": "text/csv"
+            })
+    return _SESSION
+
+def _cache_path(query_key, extension):
+    """
+    Gets the cache file path for a query, named by the SHA-1 hash of the query.
+
+    :param query_key: String that identifies the query, such as the ADQL query or the request URL.
+    :param extension: File extension of the cache file.
+    :return: Path of the cache file in CACHE_DIR.
+    """
+    return os.path.join(CACHE_DIR, hashlib.sha1(query_key.encode("utf-8")).hexdigest() + extension)
+
+def _is_cached(cache_path):
+    """
+    Checks if a cache file exists and has not expired.
+
+    :param cache_path: Path of the cache file.
+    :return: True if the cache file can be used, else False.
+    """
+    return os.path.exists(cache_path) and time.time() - os.path.getmtime(cache_path) < CACHE_EXPIRE_SECONDS
+
+def _record_lines(lines, recorded_lines):
+    """
+    Yields each line while also appending it to a list, so the lines can be cached once they have been parsed.
+
+    :param lines: Iterable of lines without line endings.
+    :param recorded_lines: List the lines are appended to.
+    :return: Generator of the provided lines.
+    """
+    for line in lines:
+        recorded_lines.append(line)
+        yield line
+
+def _write_lines(path, lines):
+    """
+    Writes lines to a text file, ending each line with a newline.
+
+    :param path: Path of the file.
+    :param lines: Iterable of lines without line endings.
+    """
+    with open(path, "w", encoding="utf-8", newline="") as lines_file:
+        lines_file.writelines(line + "\n" for line in lines)
+
+def _write_cache(cache_path, write_file):
+    """
+    Writes a cache file with the provided function. The file is written to a temporary path first, which only
+    replaces the cache file once it has been written completely and is removed if writing fails. Caching is
+    best-effort: if the cache file can't be written, a warning is logged and the query's results are still used.
+
+    :param cache_path: Path of the cache file.
+    :param write_file: Function that writes the cache contents to the path it is given.
+    """
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        temp_fd, temp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        os.close(temp_fd)
+    except OSError as error:
+        logger.warning("Could not create cache file for %s: %s", cache_path, error)
+        return
+
+    try:
+        write_file(temp_path)
+        os.replace(temp_path, cache_path)
+    except BaseException as error:
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        if not isinstance(error, OSError):
+            raise
+        logger.warning("Could not write cache file %s: %s", cache_path, error)
+
+def get_vo_exodataset(ADQL_query, select_specified_rows=0, use_cache=True):
     """
     PyVO implementation to access NASA Exoplanet Archive tables with TAP. Involves connecting
     to the NASA TAP endpoint with PyVO, and then provide the ADQL query as an arg. Simplifies
     much of the fetching and produces a DALTable rather than a JSON response.
 
     :param ADQL_query: The ADQL query used to access specific areas of data within the Exoplanet Archive database.
+    :param select_specified_rows: Maximum number of rows for the archive to return, sent as the TAP MAXREC
+                                  parameter so the row limit is applied on the server. If default is
+                                  provided (0), all rows will be acquired.
+    :param use_cache: Bool used to read and save the table in the on-disk cache. If true, a table cached from the
+                      same query is returned without contacting the archive.
     :return: An astropy table consisting of the exoplanet's and their data fetched from the ADQL query.
     """
-    # Make TAP query
-    nasa_tap_url = "https://exoplanetarchive.ipac.caltech.edu/TAP"
-    tap_service = vo.dal.TAPService(nasa_tap_url)
-
-    # Change DALtable from query to astropy table
-    result = tap_service.search(ADQL_query)
+    # Read the table from the cache if the same query was made recently
+    # ECSV keeps the column types and masks and is much faster to read than the VOTable response
+    cache_path = _cache_path(f"{ADQL_query};maxrec={select_specified_rows}", ".ecsv")
+    if use_cache and _is_cached(cache_path):
+        return Table.read(cache_path, format="ascii.ecsv")
+
+    # Make TAP query and change DALtable from query to astropy table
+    result = _tap().search(ADQL_query, maxrec=select_specified_rows or None)
     astro_table = result.to_table()
 
-    # TODO: Clean rows and columns for any masked values/columns
+    if use_cache:
+        _write_cache(cache_path, lambda path: astro_table.write(path, format="ascii.ecsv", overwrite=True))
 
     return astro_table
 
-def get_exodataset(select_strs, table_name, where_dict, select_specified_rows=0):
+def _to_column_array(values):
+    """
+    Converts the string values of a CSV column to a NumPy array. Numeric columns become float64 arrays, with
+    empty fields (NULL values in the NASA table) stored as NaN, and every other column becomes an object array.
+    A column without values can't be identified as numeric, so it becomes an empty object array.
+
+    :param values: Sequence of string values from a CSV column.
+    :return: NumPy array of the column values.
+    """
+    if not values:
+        return np.empty(0, dtype=object)
+
+    try:
+        return np.array([value if value else "nan" for value in values], dtype=np.float64)
+    except ValueError:
+        return np.array(values, dtype=object)
+
+def _parse_csv_columns(csv_lines):
+    """
+    Parses the lines of a CSV TAP response into one NumPy array per column, so later calculations read
+    each column from contiguous memory rather than looking up every row.
+
+    :param csv_lines: Iterable of CSV lines, starting with the header line of column names.
+    :return: Dictionary of column names (keys) and NumPy arrays of the column values (values).
+             A ValueError is raised if a row does not have the same number of fields as the header.
+    """
+    # Skip blank lines, which iter_lines yields when a chunk boundary falls inside a CRLF line ending
+    reader = (row for row in csv.reader(csv_lines) if row)
+    column_names = next(reader, [])
+    rows = list(reader)
+
+    # Check every row has a value for each column, since the transpose would cut all columns to the shortest row
+    for row in rows:
+        if len(row) != len(column_names):
+            raise ValueError(f"CSV row has {len(row)} fields, but the header has {len(column_names)}: {row}")
+
+    # Transpose the rows into columns
+    column_values = list(zip(*rows)) or [()] * len(column_names)
+
+    return {name: _to_column_array(values) for name, values in zip(column_names, column_values)}
+
+def rows_to_columns(results):
+    """
+    Converts a list of exoplanet row dictionaries, such as a JSON TAP response, into one NumPy array per column.
+    None values (NULL values in the NASA table) are stored as NaN.
+
+    :param results: List of dictionaries, one per exoplanet row, with the same column names as keys.
+    :return: Dictionary of column names (keys) and NumPy arrays of the column values (values).
+    """
+    if not results:
+        return {}
+
+    return {key: np.array([np.nan if planet[key] is None else planet[key] for planet in results])
+            for key in results[0]}
+
+def _where_condition(where_dict):
+    """
+    Creates the "AND" conditions of a WHERE phrase from a dictionary of table definitions and their values.
+    List values are matched with "IN", so one condition can select several values of a definition.
+
+    :param where_dict: Dictionary of table definitions (keys) and their name/numeric values shown as strings,
+                       or lists of these strings (values).
+    :return: String of the conditions joined with "AND". A ValueError is raised if a list of values is empty.
+    """
+    conditions = []
+    for key, value in where_dict.items():
+        if isinstance(value, (list, tuple)):
+            # "IN ()" is invalid ADQL, which the archive would only reject once the request is sent
+            if not value:
+                raise ValueError(f"No values provided to match '{key}' with")
+            conditions.append(f"{key} in ({', '.join(value)})")
+        else:
+            conditions.append(f"{key}={value}")
+    return " and ".join(conditions)
+
+def get_exodataset(select_strs, table_name, where_dict, select_specified_rows=0, not_null_strs=(), use_cache=True):
     """
     Function makes a TAP request to NASA exoplanet database, pscomppar and provided SQL arguments.
-    Retrieves data from that TAP request (partially formatted as an SQL query) as a JSON.
+    Retrieves data from that TAP request (partially formatted as an SQL query) as a CSV, which is a smaller
+    payload than JSON and is parsed while it is being downloaded.
     :param select_strs: List of strings to place after "SELECT" SQL phrase in url string. Can involve
                         getting specific columns from NASA table.
     :param table_name: String name of NASA data table.
     :param where_dict: Dictionary of table definitions (keys) and their name/numeric values shown as strings (values).
-                       Used to find exoplanets based on "AND" inclusions only.
+                       Used to find exoplanets based on "AND" inclusions. A list of values is matched with "IN".
+                       A list of these dictionaries is combined with "OR", so exoplanets for several sets of
+                       inclusions are fetched with a single request. A ValueError is raised if the list or
+                       any of its dictionaries are empty.
     :param select_specified_rows: Number of rows to get data from the top of the specified table. If default is
                                   provided (0), all rows will be acquired.
-    :return: JSON response
+    :param not_null_strs: List of column names that must not be NULL. Rows missing any of these columns are
+                          filtered out by the archive, so they are never downloaded.
+    :param use_cache: Bool used to read and save the response in the on-disk cache. If true, a response cached
+                      from the same request is returned without contacting the archive.
+    :return: Dictionary of the selected column names (keys) and NumPy arrays of the column values (values).
+             A requests.HTTPError is raised if the archive returns an error status.
     """
 
     # Set the API URL
-    base_url = "https://exoplanetarchive.ipac.caltech.edu/TAP/sync?query="
+    base_url = "https://exoplanetarchive.ipac.caltech.edu/TAP/sync?"
 
     # If not default value, select the top number of rows specified with
     # the columns from the provided 'select_strs' list
     if select_specified_rows != 0:
-        select_string = "select+top+" + str(select_specified_rows) + "+" + ",+".join(select_strs) + "+"
+        select_string = f"select top {select_specified_rows} " + ", ".join(select_strs)
 
     # If default value is specified, select only the columns from the provided 'select_strs' list
     else:
-        select_string = "select+" + ",+".join(select_strs) + "+"
+        select_string = "select " + ", ".join(select_strs)
 
     # Create FROM phrase of SQL query
-    from_string = "from+" + table_name + "+"
+    from_string = "from " + table_name
+
+    # Create WHERE phrase of SQL query from the "AND" inclusions and NOT NULL columns
+    # Several dictionaries of inclusions are each wrapped in parentheses and combined with "OR"
+    # An empty dictionary would match every exoplanet, which the "OR" can't express, so it is rejected
+    if isinstance(where_dict, list):
+        if not where_dict or not all(where_dict):
+            raise ValueError("A list of WHERE dictionaries can't be empty or contain an empty dictionary")
+        where_groups = [f"({_where_condition(group)})" for group in where_dict]
+        where_conditions = ["(" + " or ".join(where_groups) + ")"]
+    else:
+        where_conditions = [_where_condition(where_dict)] if where_dict else []
+    where_conditions += [f"{column} is not null" for column in not_null_strs]
+    ADQL_query = select_string + " " + from_string
+    if where_conditions:
+        ADQL_query += " where " + " and ".join(where_conditions)
+
+    # Encode the query in the URL so any special characters in it are escaped
+    url = base_url + urlencode({"query": ADQL_query, "format": "csv"})
+    logger.debug("TAP request URL: %s", url)
+
+    # Read the rows from the cache if the same request was made recently
+    cache_path = _cache_path(url, ".csv")
+    if use_cache and _is_cached(cache_path):
+        with open(cache_path, encoding="utf-8", newline="") as cache_file:
+            return _parse_csv_columns(cache_file)
+
+    # Send the request, streaming the response body so it can be parsed as it arrives
+    # Closing the response returns its connection to the session's pool, even if the request fails
+    with _session().get(url, stream=True) as response:
+        logger.debug("Finished getting request (Content-Encoding: %s)", response.headers.get("Content-Encoding"))
+
+        # Raise an HTTPError if the request still failed after any retries
+        response.raise_for_status()
+
+        # Parse the CSV rows from the response as they are downloaded
+        response.encoding = "utf-8"
+        csv_lines = response.iter_lines(chunk_size=1 << 16, decode_unicode=True)
+        response_lines = []
+        if use_cache:
+            csv_lines = _record_lines(csv_lines, response_lines)
+        results = _parse_csv_columns(csv_lines)
+
+    # Only cache the response once it has been parsed, so an invalid response is never read from the cache
+    if use_cache:
+        _write_cache(cache_path, lambda path: _write_lines(path, response_lines))
 
-    # Create WHERE phrase of SQL query
-    where_string = "where+" + ""
-    for key in where_dict:
-        where_string += key + "=" + where_dict[key] + "+and+"
-    where_string = where_string.removesuffix("+and+")
+    return results
 
-    url = base_url + select_string + from_string + where_string + "&format=json"
-    print(url)
+def get_exodatasets(queries, max_workers=MAX_CONNECTIONS):
+    """
+    Sends multiple TAP requests concurrently from a pool of threads. Each thread releases the GIL while it waits
+    on the network, so the total wait is close to the slowest requests rather than the sum of all of them.
 
-    # Set the headers
-    headers = {
-        "Content-Type": "application/x-www-form-urlencoded",
-        "Accept": "application/json"
-    }
+    :param queries: List of tuples holding the get_exodataset arguments for each request.
+    :param max_workers: Maximum number of requests sent at the same time.
+    :return: List of results for each query, in the same order as the provided queries.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda query: get_exodataset(*query), queries))
 
-    # Send the request
-    response = requests.get(url, headers=headers)
-    results = None
-    print("Finished getting request")
+async def get_exodataset_async(select_strs, table_name, where_dict, select_specified_rows=0, not_null_strs=(),
+                               use_cache=True):
+    """
+    Asynchronous version of get_exodataset. The blocking request runs in a worker thread, so several TAP requests
+    can wait on the network at the same time instead of one after another.
 
+    :param select_strs: List of strings to place after "SELECT" SQL phrase in url string.
+    :param table_name: String name of NASA data table.
+    :param where_dict: Dictionary (or list of dictionaries) of table definitions (keys) and their name/numeric values
+                       shown as strings (values).
+    :param select_specified_rows: Number of rows to get data from the top of the specified table. If default is
+                                  provided (0), all rows will be acquired.
+    :param not_null_strs: List of column names that must not be NULL.
+    :param use_cache: Bool used to read and save the response in the on-disk cache.
+    :return: Dictionary of the selected column names (keys) and NumPy arrays of the column values (values).
+    """
+    return await asyncio.to_thread(get_exodataset, select_strs, table_name, where_dict, select_specified_rows,
+                                   not_null_strs, use_cache)
 
-    # Handle response status code
-    if response.status_code == 200:
-        # Get results from the response
-        results = response.json()
-    else:
-        print(f"Error: {response.status_code}")
-        sys.exit(1)
+async def gather_exodatasets(queries):
+    """
+    Sends multiple TAP requests concurrently, so the total wait is close to the slowest request rather than
+    the sum of all of them.
 
-    #TODO: Overall, clean JSON exoplanet data of any missing values/NaN
-    #TODO: I.e., Remove specific exoplanet data (rows/keys) from JSON once missing values are detected
+    :param queries: List of tuples holding the get_exodataset arguments for each request.
+    :return: List of results for each query, in the same order as the provided queries.
+    """
+    return await asyncio.gather(*(get_exodataset_async(*query) for query in queries))
+
+if njit is not None:
+    @njit(parallel=True, error_model="numpy", cache=True)
+    def _escape_velocity_kernel(masses, radii, k):
+        """
+        Numba kernel that calculates the escape velocity of each exoplanet in one fused, parallel loop.
+
+        :param masses: Float64 array of exoplanet masses.
+        :param radii: Float64 array of exoplanet radii, in the same units system as the masses.
+        :param k: Escape velocity constant for the units of the masses and radii (K_EARTH or K_JUPITER).
+        :return: Float64 array of escape velocities in km/s.
+        """
+        escape_velocities = np.empty_like(masses)
+        for i in prange(masses.size):
+            escape_velocities[i] = math.sqrt(k * masses[i] / radii[i])
+        return escape_velocities
+else:
+    _escape_velocity_kernel = None
+
+def _calc_escape_velocities(masses, radii, k):
+    """
+    Calculates the escape velocity of every exoplanet at once for one units system. Large arrays use the compiled
+    Numba kernel if it is available, otherwise NumPy runs each step into one reused output array.
 
-    return results
+    :param masses: Float64 array of exoplanet masses.
+    :param radii: Float64 array of exoplanet radii, in the same units system as the masses.
+    :param k: Escape velocity constant for the units of the masses and radii (K_EARTH or K_JUPITER).
+    :return: Float64 array of escape velocities in km/s.
+    """
+    if _escape_velocity_kernel is not None and masses.size >= NUMBA_MIN_PLANETS:
+        return _escape_velocity_kernel(masses, radii, k)
+
+    escape_velocities = np.divide(masses, radii)
+    escape_velocities *= k
+    np.sqrt(escape_velocities, out=escape_velocities)
+    return escape_velocities
 
 def calc_escape_velocity(results, earth_units_flag=True):
     """
-    Calculates each exoplanet's escape velocity with the provided JSON/astropy table using the exoplanet's radius
+    Calculates each exoplanet's escape velocity with the provided exoplanet columns/astropy table using the exoplanet's radius
     in Earth radius units and the exoplanet's mass in Earth mass units. The results will have at least key entries
     'pl_name', 'pl_rade', 'pl_bmasse', 'pl_radj', and 'pl_bmassj'. Here's the description of these keys:
 
@@ -99,63 +436,77 @@ def calc_escape_velocity(results, earth_units_flag=True):
     - 'pl_radj': Exoplanet's radius in units of Jupiter's radius
     - 'pl_bmassj': Exoplanet's mass in units of Jupiter's mass
 
-    :param results: JSON or astropy table containing exoplanet data derived from SQL query on NASA datatable.
-                    Has keys such as 'pl_radj' and 'pl_bmassj'.
+    :param results: Dictionary of column arrays, list of row dictionaries, or astropy table containing exoplanet
+                    data derived from SQL query on NASA datatable. Has keys such as 'pl_radj' and 'pl_bmassj'.
     :param earth_units_flag: Bool used to calculate which conversion variable to use for exoplanet's radius and mass.
                              If true, convert the radius and mass from Earth's mass and radius units,
                              else, convert the radius and mass from Jupiter's mass and radius units.
-    :return: 2D List of exoplanet names and their escape velocities.
+    :return: NumPy structured array with fields 'pl_name' (exoplanet name) and 'v_esc' (escape velocity in km/s).
+             Exoplanets without a finite escape velocity, i.e., with a missing (NULL/masked) mass or radius or
+             a radius of zero, are left out.
     """
 
-    # Define the constants needed for escape velocity computation
-    earth_mass = 5.97219 * 10 ** 24
-    earth_radius = 6.371 * 10 ** 6
-    jupiter_mass = 1.89813 * 10 ** 27
-    jupiter_radius = 6.9911 * 10 ** 7
-    g = 6.674 * 10 ** -11
-
-    planet_data = []
-    for i in range(len(results)):
-        # Get the planet data
-        planet = results[i]
+    # Pick the mass and radius columns and escape velocity constant for the provided units
+    mass_key, radius_key, k = UNITS_COLUMNS[bool(earth_units_flag)]
 
-        # Get the radius and mass of the planet and convert them with Earth or Jupiter units
-        if earth_units_flag:
-            mass = planet["pl_bmasse"] * earth_mass
-            radius = planet["pl_rade"] * earth_radius
+    # Convert a list of row dictionaries (e.g., a JSON response) to columns, with empty columns if there are no rows
+    if isinstance(results, list):
+        if results:
+            results = rows_to_columns(results)
         else:
-            mass = planet["pl_bmassj"] * jupiter_mass
-            radius = planet["pl_radj"] * jupiter_radius
+            results = {"pl_name": np.empty(0, dtype=object), mass_key: np.empty(0), radius_key: np.empty(0)}
+
+    # Get the planet data as column arrays
+    # Astropy tables are stored by column, so the column data is used directly, with masked (NULL) values
+    # filled with NaN for the whole column at once. The requests method's columns already store NULLs as NaN
+    names = np.asarray(results["pl_name"])
+    if isinstance(results, Table):
+        masses = np.ma.filled(np.ma.asarray(results[mass_key], dtype=np.float64), np.nan)
+        radii = np.ma.filled(np.ma.asarray(results[radius_key], dtype=np.float64), np.nan)
+    else:
+        masses = np.asarray(results[mass_key], dtype=np.float64)
+        radii = np.asarray(results[radius_key], dtype=np.float64)
 
-        # Calculate escape velocity and change units from m/s to km/s
-        escape_velocity = (2*g*mass/radius) ** (1/2)
-        escape_velocity /= 1000
+    # Calculate every escape velocity (in km/s) at once
+    escape_velocities = _calc_escape_velocities(masses, radii, k)
 
-        # Type check velocity is a np.float
-        # If not, update to a np.float to maintain consistency between requests and PyVO methods
-        if not isinstance(escape_velocity, np.floating):
-            escape_velocity = np.float64(escape_velocity)
+    # Remove exoplanets without a valid escape velocity, i.e., with a missing mass or radius or a zero radius
+    valid_planets = np.isfinite(escape_velocities)
+    names = names[valid_planets]
+    escape_velocities = escape_velocities[valid_planets]
 
-        planet_data.append([planet["pl_name"], escape_velocity])
+    # Store the names and escape velocities as columns of one structured array
+    planet_data = np.empty(names.size, dtype=[("pl_name", names.dtype), ("v_esc", np.float64)])
+    planet_data["pl_name"] = names
+    planet_data["v_esc"] = escape_velocities
 
-    print(planet_data)
+    return planet_data
 
 if __name__ == "__main__":
     # Provide the strings needed to create a ADQL query on a NASA database for requests method
     select_args = ["pl_name", "pl_rade", "pl_radj", "pl_bmasse", "pl_bmassj"]
     nasa_table = "pscomppars"
-    where_args = {"sy_pnum": "1",
-                  "pl_ntranspec": "2"}
+    where_args = [{"sy_pnum": "1", "pl_ntranspec": "2"},
+                  {"sy_pnum": "2", "pl_ntranspec": "2"}]
+    # Only get exoplanets with the mass and radius needed for the escape velocity
+    not_null_args = ["pl_bmasse", "pl_rade"]
 
     # Provide ADQL query for pyvo method
-    query = "SELECT TOP 5 pl_name, pl_rade, pl_bmasse FROM pscomppars WHERE sy_pnum=1 AND pl_ntranspec=2"
+    query = ("SELECT TOP 5 pl_name, pl_rade, pl_bmasse FROM pscomppars WHERE sy_pnum=1 AND pl_ntranspec=2 "
+             "AND pl_bmasse IS NOT NULL AND pl_rade IS NOT NULL")
 
     # True = use pyvo method, False = use requests method
     use_pyvo = False
 
+    # Show the request URLs and progress
+    logging.basicConfig()
+    logger.setLevel(logging.DEBUG)
+
     if use_pyvo is True:
         exo_table = get_vo_exodataset(query)
-        calc_escape_velocity(exo_table, earth_units_flag=True)
+        print(calc_escape_velocity(exo_table, earth_units_flag=True))
     else:
-        json_results = get_exodataset(select_args, nasa_table, where_args, select_specified_rows=5)
-        calc_escape_velocity(json_results, earth_units_flag=True)
+        # Send a request for each set of WHERE arguments concurrently
+        queries = [(select_args, nasa_table, where_dict, 5, not_null_args) for where_dict in where_args]
+        for exo_results in get_exodatasets(queries):
+            print(calc_escape_velocity(exo_results, earth_units_flag=True))
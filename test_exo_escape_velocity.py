@@ -0,0 +1,256 @@
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pytest
+
+import exo_escape_velocity as exo
+
+
+def test_parse_csv_columns_converts_columns():
+    columns = exo._parse_csv_columns(["pl_name,pl_rade,pl_bmasse", '"Kepler-10 b",1.47,', "b,3,4"])
+
+    assert list(columns) == ["pl_name", "pl_rade", "pl_bmasse"]
+    assert columns["pl_name"].tolist() == ["Kepler-10 b", "b"]
+    assert columns["pl_rade"].dtype == np.float64
+    assert columns["pl_rade"].tolist() == [1.47, 3.0]
+    assert np.isnan(columns["pl_bmasse"][0])
+    assert columns["pl_bmasse"][1] == 4.0
+
+
+def test_parse_csv_columns_skips_blank_lines():
+    columns = exo._parse_csv_columns(["", "pl_name,pl_rade,pl_bmasse", "a,1,2", "", "b,3,4", ""])
+
+    assert columns["pl_name"].tolist() == ["a", "b"]
+    assert columns["pl_rade"].tolist() == [1.0, 3.0]
+    assert columns["pl_bmasse"].tolist() == [2.0, 4.0]
+
+
+def test_parse_csv_columns_rejects_short_rows():
+    with pytest.raises(ValueError):
+        exo._parse_csv_columns(["pl_name,pl_rade,pl_bmasse", "a,1,2", "b,3"])
+
+
+def test_parse_csv_columns_without_rows():
+    columns = exo._parse_csv_columns(["pl_name,pl_rade"])
+
+    assert list(columns) == ["pl_name", "pl_rade"]
+    assert columns["pl_rade"].size == 0
+
+
+def test_calc_escape_velocity_from_rows():
+    planet_data = exo.calc_escape_velocity([
+        {"pl_name": "Earth", "pl_bmasse": 1.0, "pl_rade": 1.0},
+        {"pl_name": "No mass", "pl_bmasse": None, "pl_rade": 2.0}
+    ])
+
+    assert planet_data["pl_name"].tolist() == ["Earth"]
+    assert planet_data["v_esc"][0] == pytest.approx(11.19, abs=0.01)
+
+
+def test_calc_escape_velocity_without_rows():
+    planet_data = exo.calc_escape_velocity([])
+
+    assert planet_data.size == 0
+    assert planet_data.dtype.names == ("pl_name", "v_esc")
+
+
+class FakeResponse:
+    def __init__(self, lines):
+        self.lines = lines
+        self.headers = {}
+        self.encoding = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self, chunk_size, decode_unicode):
+        return iter(self.lines)
+
+
+class FakeSession:
+    def __init__(self, lines):
+        self.lines = lines
+        self.urls = []
+
+    def get(self, url, stream):
+        self.urls.append(url)
+        return FakeResponse(self.lines)
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(exo, "CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def use_fake_session(monkeypatch, lines):
+    session = FakeSession(lines)
+    monkeypatch.setattr(exo, "_session", lambda: session)
+    return session
+
+
+def test_get_exodataset_caches_response(cache_dir, monkeypatch):
+    session = use_fake_session(monkeypatch, ["pl_name,pl_rade", "a,1"])
+
+    first_columns = exo.get_exodataset(["pl_name", "pl_rade"], "pscomppars", {})
+    cached_columns = exo.get_exodataset(["pl_name", "pl_rade"], "pscomppars", {})
+
+    assert len(session.urls) == 1
+    assert cached_columns["pl_name"].tolist() == first_columns["pl_name"].tolist() == ["a"]
+    assert cached_columns["pl_rade"].tolist() == [1.0]
+    assert [path.suffix for path in cache_dir.iterdir()] == [".csv"]
+
+
+def test_get_exodataset_does_not_cache_invalid_response(cache_dir, monkeypatch):
+    use_fake_session(monkeypatch, ["pl_name,pl_rade,pl_bmasse", "a,1,2", "b,3"])
+
+    with pytest.raises(ValueError):
+        exo.get_exodataset(["pl_name", "pl_rade", "pl_bmasse"], "pscomppars", {})
+
+    assert list(cache_dir.iterdir()) == []
+
+
+def test_get_exodataset_does_not_cache_interrupted_download(cache_dir, monkeypatch):
+    def interrupted_lines():
+        yield "pl_name,pl_rade"
+        raise ConnectionError("download interrupted")
+
+    use_fake_session(monkeypatch, interrupted_lines())
+
+    with pytest.raises(ConnectionError):
+        exo.get_exodataset(["pl_name", "pl_rade"], "pscomppars", {})
+
+    assert list(cache_dir.iterdir()) == []
+
+
+def test_write_cache_table_round_trip(cache_dir):
+    cache_path = exo._cache_path("query", ".ecsv")
+    astro_table = exo.Table({"pl_name": ["a", "b"], "pl_rade": [1.0, 2.0]})
+
+    exo._write_cache(cache_path, lambda path: astro_table.write(path, format="ascii.ecsv", overwrite=True))
+
+    assert [path.suffix for path in cache_dir.iterdir()] == [".ecsv"]
+    assert exo.Table.read(cache_path, format="ascii.ecsv")["pl_rade"].tolist() == [1.0, 2.0]
+
+
+def test_write_cache_removes_partial_file(cache_dir):
+    def failing_write(path):
+        with open(path, "w") as cache_file:
+            cache_file.write("# %ECSV")
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        exo._write_cache(exo._cache_path("query", ".ecsv"), failing_write)
+
+    assert list(cache_dir.iterdir()) == []
+
+
+def test_session_is_shared_between_threads(monkeypatch):
+    monkeypatch.setattr(exo, "_SESSION", None)
+
+    with exo.ThreadPoolExecutor(max_workers=8) as executor:
+        sessions = list(executor.map(lambda _: exo._session(), range(32)))
+
+    assert all(session is sessions[0] for session in sessions)
+
+
+def test_where_condition():
+    assert exo._where_condition({"sy_pnum": ["1", "2"], "pl_ntranspec": "2"}) == "sy_pnum in (1, 2) and pl_ntranspec=2"
+
+
+def test_where_condition_rejects_empty_list():
+    with pytest.raises(ValueError):
+        exo._where_condition({"sy_pnum": []})
+
+
+def test_get_exodataset_without_writable_cache(tmp_path, monkeypatch, caplog):
+    # A cache directory inside a regular file can never be created
+    (tmp_path / "not_a_directory").write_text("")
+    monkeypatch.setattr(exo, "CACHE_DIR", str(tmp_path / "not_a_directory" / "cache"))
+    use_fake_session(monkeypatch, ["pl_name,pl_rade", "a,1"])
+
+    columns = exo.get_exodataset(["pl_name", "pl_rade"], "pscomppars", {})
+
+    assert columns["pl_name"].tolist() == ["a"]
+    assert "Could not create cache file" in caplog.text
+
+
+def test_write_cache_failure_is_logged(cache_dir, caplog):
+    def failing_write(path):
+        raise OSError("disk full")
+
+    exo._write_cache(exo._cache_path("query", ".ecsv"), failing_write)
+
+    assert list(cache_dir.iterdir()) == []
+    assert "disk full" in caplog.text
+
+
+def test_get_exodataset_query(cache_dir, monkeypatch):
+    session = use_fake_session(monkeypatch, ["pl_name,pl_rade", "a,1"])
+
+    exo.get_exodataset(["pl_name", "pl_rade"], "pscomppars",
+                       [{"sy_pnum": ["1", "2"], "pl_ntranspec": "2"}, {"hostname": "'K2-18'"}],
+                       select_specified_rows=5, not_null_strs=["pl_bmasse", "pl_rade"], use_cache=False)
+
+    query_params = parse_qs(urlsplit(session.urls[0]).query)
+    assert query_params["format"] == ["csv"]
+    assert query_params["query"] == [
+        "select top 5 pl_name, pl_rade from pscomppars "
+        "where ((sy_pnum in (1, 2) and pl_ntranspec=2) or (hostname='K2-18')) "
+        "and pl_bmasse is not null and pl_rade is not null"
+    ]
+
+
+def test_get_exodataset_query_without_where(cache_dir, monkeypatch):
+    session = use_fake_session(monkeypatch, ["pl_name", "a"])
+
+    exo.get_exodataset(["pl_name"], "pscomppars", {}, use_cache=False)
+
+    assert parse_qs(urlsplit(session.urls[0]).query)["query"] == ["select pl_name from pscomppars"]
+
+
+@pytest.mark.parametrize("where_dict", [[], [{"sy_pnum": "1"}, {}]])
+def test_get_exodataset_rejects_empty_where_groups(cache_dir, monkeypatch, where_dict):
+    session = use_fake_session(monkeypatch, ["pl_name", "a"])
+
+    with pytest.raises(ValueError):
+        exo.get_exodataset(["pl_name"], "pscomppars", where_dict)
+
+    assert session.urls == []
+
+
+def test_calc_escape_velocity_from_header_only_response(cache_dir, monkeypatch):
+    use_fake_session(monkeypatch, ["pl_name,pl_rade,pl_bmasse"])
+
+    planet_data = exo.calc_escape_velocity(exo.get_exodataset(["pl_name", "pl_rade", "pl_bmasse"], "pscomppars", {}))
+
+    assert planet_data.size == 0
+    assert planet_data.dtype == exo.calc_escape_velocity([]).dtype
+    assert planet_data.dtype["pl_name"] == object
+
+
+def test_calc_escape_velocity_from_masked_table():
+    exo_table = exo.Table(masked=True)
+    exo_table["pl_name"] = ["Earth", "No mass", "No radius", "Zero radius"]
+    exo_table["pl_bmasse"] = np.ma.MaskedArray([1.0, 1.0, 1.0, 1.0], mask=[False, True, False, False])
+    exo_table["pl_rade"] = np.ma.MaskedArray([1.0, 1.0, 1.0, 0.0], mask=[False, False, True, False])
+
+    with np.errstate(divide="ignore"):
+        planet_data = exo.calc_escape_velocity(exo_table)
+
+    assert planet_data["pl_name"].tolist() == ["Earth"]
+    assert planet_data["v_esc"][0] == pytest.approx(11.19, abs=0.01)
+
+
+def test_calc_escape_velocity_jupiter_units():
+    exo_table = exo.Table({"pl_name": ["Jupiter"], "pl_bmassj": [1.0], "pl_radj": [1.0]})
+
+    planet_data = exo.calc_escape_velocity(exo_table, earth_units_flag=False)
+
+    assert planet_data["v_esc"][0] == pytest.approx(60.2, abs=0.1)